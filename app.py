@@ -1,93 +1,144 @@
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Figures are only rasterized for Solara, never shown interactively
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
 import solara
-from mesa.visualization import SolaraViz, make_plot_component, make_space_component
+from mesa.visualization import SolaraViz, make_space_component
 from src.model import EngineeringTeamModel
 from src.agents import EngineerAgent, ManagerAgent
+from src.utils.analysis import lttb_indices
+
+# Figures, axes and line handles are created once per model and redrawn in place
+# on every render instead of allocating a new Figure per model step. They are kept
+# on the model, so separate sessions and reset models never draw into each other's figures.
+MAX_LINE_POINTS = 500
+
+def _figure_cache(model):
+    """Return the model's figure and line caches, creating them on first use."""
+    cache = getattr(model, "_figure_cache", None)
+    if cache is None:
+        cache = model._figure_cache = {"figures": {}, "lines": {}}
+    return cache
+
+def _reuse_figure(model, key, figsize, nrows=1):
+    """Return the model's (figure, axes) pair cached under key, creating it on first use."""
+    figures = _figure_cache(model)["figures"]
+    if key not in figures:
+        fig = Figure(figsize=figsize, dpi=100)
+        figures[key] = (fig, fig.subplots(nrows))
+    return figures[key]
+
+def get_cached_agent_vars(model):
+    """Return the agent-vars DataFrame, rebuilt at most once per model step."""
+    cached = getattr(model, "_cached_agent_vars", None)
+    if cached is None or cached[0] != model.steps:
+        cached = (model.steps, model.datacollector.get_agent_vars_dataframe())
+        model._cached_agent_vars = cached
+    return cached[1]
+
+def _reuse_line(model, ax, key, title, ylabel, **plot_kwargs):
+    """Return the model's line cached under key, creating it on ax on first use."""
+    lines = _figure_cache(model)["lines"]
+    if key not in lines:
+        lines[key], = ax.plot([], [], label="TEAM", **plot_kwargs)
+        ax.set_title(title)
+        ax.set_xlabel("Simulation Step")
+        ax.set_ylabel(ylabel)
+    return lines[key]
+
+# Portrayals are built once per agent state. Mesa's matplotlib space drawer pops
+# keys off the dict it receives, so agent_portrayal hands out shallow copies.
+# "w"/"h" are not portrayal fields for that drawer (it ignores them and warns on
+# every agent, every frame), so they are left out.
+_SEEKING_AGENT_PORTRAYAL = {"color": "green"}
+_SEEKING_KNOWLEDGE_PORTRAYAL = {"color": "orange"}
+_ENGINEER_PORTRAYAL = {"color": "blue"}
+_MANAGER_PORTRAYAL = {"color": "red"}
 
 def agent_portrayal(agent):
     if isinstance(agent, EngineerAgent):
         if agent.seeking_agent:
-            return {"color": "green", "w": 0.7, "h": 0.7}
+            return _SEEKING_AGENT_PORTRAYAL.copy()
         elif agent.seeking_knowledge:
-            return {"color": "orange", "w": 0.7, "h": 0.7}
+            return _SEEKING_KNOWLEDGE_PORTRAYAL.copy()
         else:
-            return {"color": "blue"}
+            return _ENGINEER_PORTRAYAL.copy()
     elif isinstance(agent, ManagerAgent):
-        return {"color": "red", "w": 0.9, "h": 0.9}
+        return _MANAGER_PORTRAYAL.copy()
     return {}
 
-def make_knowledge_linechart(model):
-    fig = Figure(figsize=(8, 5), dpi=100)
-    ax = fig.subplots()
-
-    model_data = model.datacollector.get_model_vars_dataframe()
-    agent_data = model.datacollector.get_agent_vars_dataframe()
-
-    for column in model_data.columns:
-        if column == "Average_knowledge":
-            ax.plot(
-                model_data.index,
-                model_data[column],
-                label=f"TEAM",
-                color="blue"
-            )
-
-    ax.set_title("Knowledge")
-    ax.set_xlabel("Simulation Step")
-    ax.set_ylabel("Knowledge")
+def _figure_for_step(model, draw):
+    """Wrap the figure returned by draw() for Solara, redrawing only when the model has stepped."""
+    dependencies = [model, model.steps]
+    fig = solara.use_memo(draw, dependencies)
+    return solara.FigureMatplotlib(fig, dependencies=dependencies)
+
+# (model reporter, title, plot kwargs) for each panel of the team metrics chart
+TEAM_SERIES = [
+    ("Average_PPS", "Psychological Safety", {}),
+    ("Average_Knowledge", "Knowledge", {"color": "blue"}),
+]
+
+def make_team_metrics_chart(model):
+    """Team-level model reporters on a single figure, one panel per series."""
+    return _figure_for_step(model, lambda: _draw_team_metrics_chart(model))
+
+def _draw_team_metrics_chart(model):
+    """
+    Reads each plotted column straight from the collector's per-column lists
+    instead of materializing the whole model-vars DataFrame every render.
+    """
+    fig, axes = _reuse_figure(model, "team_metrics", (8, 8), nrows=len(TEAM_SERIES))
+
+    for ax, (column, title, plot_kwargs) in zip(axes, TEAM_SERIES):
+        line = _reuse_line(model, ax, column, title, title, **plot_kwargs)
+
+        values = model.datacollector.model_vars[column]
+        steps = np.arange(len(values))
+        # Long runs are downsampled so the plotted point count stays bounded
+        keep = lttb_indices(steps, values, MAX_LINE_POINTS)
+        line.set_data(steps[keep], np.asarray(values, dtype=float)[keep])
+
+        ax.relim()
+        ax.autoscale_view()
 
     fig.tight_layout()
 
-    return solara.FigureMatplotlib(fig)
-
-def make_psych_safety_linechart(model):
-    fig = Figure(figsize=(8, 5), dpi=100)
-    ax = fig.subplots()
-
-    model_data = model.datacollector.get_model_vars_dataframe()
-    agent_data = model.datacollector.get_agent_vars_dataframe()
-
-    for column in model_data.columns:
-        if column == "Average_PPS":
-            ax.plot(
-                model_data.index,
-                model_data[column],
-                label=f"TEAM",
-            )
-
-    ax.set_title("Psychological Safety")
-    ax.set_xlabel("Simulation Step")
-    ax.set_ylabel("Psychological Safety")
-
-    fig.tight_layout()
-
-    return solara.FigureMatplotlib(fig)
+    return fig
 
 def make_task_status_chart(model):
     """Create a chart showing current task for each agent."""
-    fig = Figure(figsize=(10, 8), dpi=100)
-    ax = fig.subplots()
+    return _figure_for_step(model, lambda: _draw_task_status_chart(model))
+
+def _draw_task_status_chart(model):
+    fig, ax = _reuse_figure(model, "task_status", (10, 8))
+    ax.clear()
 
     # Get agent data from datacollector
-    agent_data = model.datacollector.get_agent_vars_dataframe()
-    
+    agent_data = get_cached_agent_vars(model)
+
+    # Pull the latest step's rows out positionally with numpy and index them by
+    # agent, rather than doing a MultiIndex label lookup for every agent
+    latest_tasks = {}
+    if not agent_data.empty:
+        steps = agent_data.index.get_level_values('Step').to_numpy()
+        agent_ids = agent_data.index.get_level_values('AgentID').to_numpy()
+        # Task IDs are ints; idle rows make pandas store the column as float with NaN
+        task_ids = agent_data['Current_Task'].astype('Int64').to_numpy(dtype=object, na_value=None)
+        latest = steps == steps.max()
+        latest_tasks = dict(zip(agent_ids[latest].tolist(), task_ids[latest].tolist()))
+
     # Get all agents and their current tasks
     agents = []
     tasks = []
     colors = []
-    
+
     for agent in model.agents:
         agents.append(f"Agent {agent.unique_id}")
-        
-        current_task = None
-        if not agent_data.empty and len(agent_data) > 0:
-            try:
-                latest_step = agent_data.index.get_level_values('Step').max()
-                agent_row = agent_data.loc[(latest_step, agent.unique_id)]
-                current_task = agent_row.get('Current_Task', None)
-            except (KeyError, IndexError):
-                pass
-        
+
+        current_task = latest_tasks.get(agent.unique_id)
+
         # Fallback to direct attribute access
         if current_task is None:
             current_task = agent.current_task.id if hasattr(agent, "current_task") and agent.current_task else None
@@ -110,27 +161,30 @@ def make_task_status_chart(model):
     # Create horizontal bar chart
     y_pos = range(len(agents))
     
-    # Create bars (just for visuals - length doesn't matter much)
-    bars = ax.barh(y_pos, [1] * len(agents), color=colors, alpha=0.7)
-    
-    # Add task text on the bars
-    for i, (bar, task) in enumerate(zip(bars, tasks)):
+    # Draw every bar as one PolyCollection instead of one Rectangle artist per
+    # agent (just for visuals - length doesn't matter much)
+    bar_verts = [[(0, y - 0.4), (0, y + 0.4), (1, y + 0.4), (1, y - 0.4)] for y in y_pos]
+    ax.add_collection(PolyCollection(bar_verts, facecolors=colors, alpha=0.7))
+    ax.autoscale_view()
+    ax.set_xlim(0, 1)
+
+    # Add task text on the bars once the limits are fixed
+    for y, task in zip(y_pos, tasks):
         # Truncate long task names
         display_task = task[:30] + "..." if len(task) > 30 else task
-        ax.text(0.5, bar.get_y() + bar.get_height()/2, display_task, 
+        ax.text(0.5, y, display_task,
                 ha='center', va='center', fontweight='bold', fontsize=9)
-    
+
     # Customize the chart
     ax.set_yticks(y_pos)
     ax.set_yticklabels(agents)
     ax.set_xlabel('Current Task')
     ax.set_title(f'Agent Task Status (Step {model.steps})')
-    ax.set_xlim(0, 1)
     
     # Remove x-axis ticks since they're not meaningful
     ax.set_xticks([])
     
-    # Invert y-axis to show Agent 0 at the top
+    # Invert y-axis to show Agent 1 at the top
     ax.invert_yaxis()
     
     # Add grid for better readability
@@ -138,57 +192,7 @@ def make_task_status_chart(model):
     
     fig.tight_layout()
     
-    return solara.FigureMatplotlib(fig)
-
-
-def make_knowledge_linechart(model):
-    fig = Figure(figsize=(8, 5), dpi=100)
-    ax = fig.subplots()
-
-    model_data = model.datacollector.get_model_vars_dataframe()
-    agent_data = model.datacollector.get_agent_vars_dataframe()
-
-    for column in model_data.columns:
-        if column == "Average_knowledge":
-
-            ax.plot(
-                model_data.index,
-                model_data[column],
-                label=f"TEAM",
-                color="blue"
-            )
-
-    ax.set_title("Knowledge")
-    ax.set_xlabel("Simulation Step")
-    ax.set_ylabel("Knowledge")
-
-    fig.tight_layout()
-
-    return solara.FigureMatplotlib(fig)
-
-
-def make_psych_safety_linechart(model):
-    fig = Figure(figsize=(8, 5), dpi=100)
-    ax = fig.subplots()
-
-    model_data = model.datacollector.get_model_vars_dataframe()
-    agent_data = model.datacollector.get_agent_vars_dataframe()
-
-    for column in model_data.columns:
-        if column == "Average_PPS":
-            ax.plot(
-                model_data.index,
-                model_data[column],
-                label=f"TEAM",
-            )
-
-    ax.set_title("Psychological Safety")
-    ax.set_xlabel("Simulation Step")
-    ax.set_ylabel("Psychological Safety")
-
-    fig.tight_layout()
-
-    return solara.FigureMatplotlib(fig)
+    return fig
 
 
 graph = make_space_component(agent_portrayal, backend="matplotlib")
@@ -230,7 +234,7 @@ def create_model(**kwargs):
 
 page = SolaraViz(
     create_model(),
-    components=[graph, make_psych_safety_linechart, make_knowledge_linechart, make_task_status_chart],
+    components=[graph, make_team_metrics_chart, make_task_status_chart],
     model_params=model_params,
     name="TEAMS Model",
 )
\ No newline at end of file
@@ -1,6 +1,4 @@
-import matplotlib.pyplot as plt # Import for displaying plots
 from src.model import EngineeringTeamModel
-from src.types import TaskStatus
 from src.utils import log
 
 if __name__ == "__main__":
@@ -31,8 +29,7 @@ if __name__ == "__main__":
         model.step()
         # Optional: Print progress
         if (i + 1) % 20 == 0 or i == num_steps - 1:
-            completed = len([t for t in model.tasks.values() if t.status == TaskStatus.COMPLETED])
-            print(f"Step {i+1}/{num_steps} | Completed Tasks: {completed} | Psych Safety: {model.psychological_safety:.2f}")
+            print(f"Step {i+1}/{num_steps} | Completed Tasks: {model.completed_task_count} | Psych Safety: {model.psychological_safety:.2f}")
             
     print("\nSimulation Finished.")
 
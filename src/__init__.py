@@ -1,8 +1,30 @@
 # Main package initialization
 
-from .model import EngineeringTeamModel
-from .agents import BaseAgent, EngineerAgent, ManagerAgent
-from .types import TaskStatus, Task
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .model import EngineeringTeamModel
+    from .agents import BaseAgent, EngineerAgent, ManagerAgent
+    from .types import TaskStatus, Task
+
+# Re-exports are resolved on first access (PEP 562) so importing the package,
+# or a light submodule like src.types, doesn't pull in mesa and the agents.
+_LAZY_EXPORTS = {
+    'EngineeringTeamModel': '.model',
+    'BaseAgent': '.agents',
+    'EngineerAgent': '.agents',
+    'ManagerAgent': '.agents',
+    'TaskStatus': '.types',
+    'Task': '.types',
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'EngineeringTeamModel',
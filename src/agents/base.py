@@ -1,78 +1,76 @@
 import mesa
-import random
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, TYPE_CHECKING
 from ..utils import log
+from .components.history import AgentHistory
+from ..types import AgentKind, InteractionDetails
 
 if TYPE_CHECKING:
     from ..model import EngineeringTeamModel
 
 class BaseAgent(mesa.Agent):
     """Base class for all agents in the engineering team model."""
+
+    agent_kind = AgentKind.OTHER  # Overridden by each concrete agent class
     
-    def __init__(self, unique_id: int, model: 'EngineeringTeamModel'): # Keep as string literal for forward reference
-        super().__init__(model)
-        self.unique_id = unique_id
-        self.name = f"Agent {unique_id}"
+    def __init__(self, model: 'EngineeringTeamModel'): # Keep as string literal for forward reference
+        super().__init__(model)  # Mesa assigns unique_id
+        self.name = f"Agent {self.unique_id}"
         self.attributes: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
-
-    @property
-    def __dict__(self):
-        original_dict = super().__dict__
-        original_dict['unique_id'] = self.unique_id
-        original_dict['attributes'] = self.attributes
-        original_dict['history'] = self.history
-        return {k: v for k, v in original_dict.items() if k != 'model'}
+        self.history = AgentHistory(maxlen=model.history_cap)
+        # Where actions go: the in-memory history (unless history_cap is 0) and the log file
+        self._keep_history = model.history_cap != 0
+        self._write_log = model.is_logging
+        # Whether recording an action does anything at all; hot paths check this before building details
+        self.log_enabled = self._keep_history or self._write_log
 
     def _log_history(self, action: str, details: Dict[str, Any] = None):
-        """Logs an action taken by the agent to both internal history and file."""
-        log_entry = {"step": self.model.steps, "action": action}
-        if details:
-            log_entry.update(details)
-        self.history.append(log_entry)
-        
-        log.log_agent_action(
-            self.unique_id,
-            self.model.steps,
-            action,
-            details
-        )
+        """Logs an action taken by the agent to internal history and queues it for the log file."""
+        if self._keep_history:
+            self.history.append(self.model.steps, action, details)
+        if self._write_log:
+            log.batcher.append((self.unique_id, self.model.steps, action, details))
+
+    def _log_event(self, action: str, *args):
+        """Like _log_history, for actions listed in log.EVENT_FIELDS: details are kept as a positional tuple."""
+        if self._keep_history:
+            self.history.append(self.model.steps, action, args)
+        if self._write_log:
+            log.batcher.append((self.unique_id, self.model.steps, action, args))
         
-    def initiate_interaction(self, recipient_agent: 'BaseAgent', interaction_type: Any, details: Dict[str, Any] = None) -> bool:
+    def initiate_interaction(self, recipient_agent: 'BaseAgent', interaction_type: Any, details: InteractionDetails = None) -> bool:
         """
         Initiates an interaction with another agent.
         This method itself doesn't check psychological safety; the calling agent decides based on its own state.
-        Returns True if the interaction was successfully initiated (i.e., logged and sent), False otherwise.
+        The recipient receives it when the model delivers pending interactions at the end of the step.
+        Returns True if the interaction was successfully initiated (i.e., logged and queued), False otherwise.
         """
 
         if recipient_agent:
             if details is None:
-                details = {}
-            if "interaction_duration" not in details:
-                details["interaction_duration"] = random.uniform(0.5, 10)
+                details = InteractionDetails(interaction_duration=self.model.next_uniform(0.5, 10))
 
             self._log_history("initiate_interaction", {
-                "type": str(interaction_type),
+                "type": interaction_type,
                 "recipient": recipient_agent.unique_id,
                 "details": details
             })
-            recipient_agent.receive_interaction(self, interaction_type, details)
+            self.model.pending_interactions.append((recipient_agent.receive_interaction, (self, interaction_type, details)))
             return True
         else:
             self._log_history("interaction_failed_no_recipient", {
-                "type": str(interaction_type),
+                "type": interaction_type,
                 "details": details
             })
             return False
 
 
-    def receive_interaction(self, sender_agent: 'BaseAgent', interaction_type: Any, details: Dict[str, Any] = None):
+    def receive_interaction(self, sender_agent: 'BaseAgent', interaction_type: Any, details: InteractionDetails = None):
         """
         Processes an incoming interaction from another agent.
         This method can be overridden by specific agent types to define reactions.
         """
         self._log_history("receive_interaction", {
-            "type": str(interaction_type),
+            "type": interaction_type,
             "sender": sender_agent.unique_id,
             "details": details
         })
@@ -0,0 +1,34 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional
+from ...utils.log import event_details
+
+class AgentHistory:
+    """Columnar record of the actions taken by an agent.
+
+    Each column is appended to separately instead of building a dict per event;
+    the row-wise view is only materialized on demand. With maxlen set, only the
+    most recent maxlen actions are kept (the full record goes to the log file).
+    """
+
+    def __init__(self, maxlen: Optional[int] = None):
+        self.steps: Deque[int] = deque(maxlen=maxlen)
+        self.actions: Deque[str] = deque(maxlen=maxlen)
+        # A dict, or a tuple of positional values for actions listed in log.EVENT_FIELDS
+        self.details: Deque[Any] = deque(maxlen=maxlen)
+
+    def append(self, step: int, action: str, details: Any = None):
+        """Record one action."""
+        self.steps.append(step)
+        self.actions.append(action)
+        self.details.append(details)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield entries in the same shape as the old list-of-dicts history."""
+        for step, action, details in zip(self.steps, self.actions, self.details):
+            entry = {"step": step, "action": action}
+            if details:
+                entry.update(event_details(action, details))
+            yield entry
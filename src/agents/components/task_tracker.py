@@ -1,12 +1,18 @@
-from typing import List, Optional, TYPE_CHECKING
-from enum import StrEnum
+from collections import deque
+from typing import Collection, Deque, Dict, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+from enum import IntEnum, StrEnum
 from dataclasses import dataclass, field
-import uuid
+import itertools
 import random
+import sys
 
 if TYPE_CHECKING:
     from ..engineer import EngineerAgent
 
+# Task and subtask IDs are handed out sequentially, starting at 1
+_task_ids = itertools.count(1)
+_subtask_ids = itertools.count(1)
+
 class TaskStatus(StrEnum):
     BACKLOG = "backlog"
     IN_PROGRESS = "in_progress"
@@ -19,9 +25,9 @@ class SubTaskStatus(StrEnum):
     COMPLETED = "completed"
     BLOCKED = "blocked"
 
-@dataclass
+@dataclass(slots=True)
 class Task:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: int = field(default_factory=lambda: next(_task_ids))
     name: str = ""
     status: TaskStatus = TaskStatus.BACKLOG
     assigned_to: Optional[str] = None
@@ -29,12 +35,45 @@ class Task:
     subtasks: List['SubTask'] = field(default_factory=list)
     start_time: Optional[int] = None  # Step when task was started
 
+    # Status of each subtask by position in subtasks, kept in sync by add_subtask and the SubTask
+    # status methods, so status scans run over one flat list instead of every SubTask object
+    _subtask_status: List['SubTaskStatus'] = field(default_factory=list, init=False, repr=False, compare=False)
+    _completed_subtasks: int = field(default=0, init=False, repr=False, compare=False)  # Count of COMPLETED in _subtask_status
+
+    def __post_init__(self):
+        subtasks, self.subtasks = self.subtasks, []
+        for subtask in subtasks:
+            self.add_subtask(subtask)
+
+    def add_subtask(self, subtask: 'SubTask'):
+        """Append a subtask to this task, registering it in the status list."""
+        subtask._task = self
+        subtask._index = len(self.subtasks)
+        self.subtasks.append(subtask)
+        self._subtask_status.append(subtask.status)
+        if subtask.status == SubTaskStatus.COMPLETED:
+            self._completed_subtasks += 1
+
+    def all_subtasks_completed(self) -> bool:
+        """Whether every subtask is completed (O(1), from the maintained counter)."""
+        return self._completed_subtasks == len(self.subtasks)
+
+    def count_subtasks(self, status: 'SubTaskStatus') -> int:
+        """Number of subtasks with the given status."""
+        return self._subtask_status.count(status)
+
+    def first_subtask_with_status(self, status: 'SubTaskStatus') -> Optional['SubTask']:
+        """First subtask, in order, with the given status, or None."""
+        try:
+            return self.subtasks[self._subtask_status.index(status)]
+        except ValueError:
+            return None
+
     def get_progress(self) -> float:
         """Calculate task progress based on completed subtasks."""
         if not self.subtasks:
             return 0.0
-        completed_subtasks = sum(1 for task in self.subtasks if task.status == SubTaskStatus.COMPLETED)
-        return completed_subtasks / len(self.subtasks)
+        return self._completed_subtasks / len(self.subtasks)
 
     def start(self, step: int = 0):
         """Start the task by changing status to IN_PROGRESS"""
@@ -66,48 +105,73 @@ class Task:
         """Remove task assignment"""
         self.assigned_to = None
 
-@dataclass
+@dataclass(slots=True)
 class SubTask:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: int = field(default_factory=lambda: next(_subtask_ids))
     name: str = ""
     status: SubTaskStatus = SubTaskStatus.NOT_STARTED
     assigned_to: Optional[str] = None
-    dependencies: List[str] = field(default_factory=list)
-    required_knowledge: List[str] = field(default_factory=list)
+    dependencies: Tuple[int, ...] = ()
+    required_knowledge: Tuple[str, ...] = ()
     required_steps: int = field(default_factory=lambda: random.randint(1, 10))
     difficulty: int = field(default_factory=lambda: random.randint(1, 10))
     steps_completed: int = 0
     progress: float = 0.0
     start_time: Optional[int] = None  # Step when subtask was started
+    _task: Optional[Task] = field(default=None, init=False, repr=False, compare=False)  # Set by Task.add_subtask
+    _index: int = field(default=-1, init=False, repr=False, compare=False)  # Position in _task.subtasks
+
+    def _set_status(self, status: 'SubTaskStatus'):
+        """Change status, mirroring it into the owning task's status list and completion count."""
+        previous, self.status = self.status, status
+        task = self._task
+        if task is not None:
+            task._subtask_status[self._index] = status
+            if status == SubTaskStatus.COMPLETED:
+                if previous != SubTaskStatus.COMPLETED:
+                    task._completed_subtasks += 1
+            elif previous == SubTaskStatus.COMPLETED:
+                task._completed_subtasks -= 1
+
+    def __post_init__(self):
+        # Both are fixed once the subtask exists: store them as tuples, with concepts interned
+        self.dependencies = tuple(self.dependencies)
+        self.required_knowledge = tuple(sys.intern(concept) for concept in self.required_knowledge)
 
     def is_complete(self) -> bool:
         """Check if the subtask is completed"""
         return self.status == SubTaskStatus.COMPLETED
 
-    def can_start(self, completed_subtasks: List[str]) -> bool:
-        """Check if all dependencies are satisfied"""
-        if not completed_subtasks:
-            completed_subtasks = []
-        return all(dep_id in completed_subtasks for dep_id in self.dependencies)
+    def can_start(self, completed_subtasks: Collection[int]) -> bool:
+        """Check if all dependencies are satisfied; pass a set to skip the conversion."""
+        if not self.dependencies:
+            return True
+        if not isinstance(completed_subtasks, (set, frozenset)):
+            completed_subtasks = set(completed_subtasks or ())
+        return completed_subtasks.issuperset(self.dependencies)
     
-    def start(self, completed_subtasks: List[str] = None, step: int = 0):
+    def _try_start(self, completed_subtasks: Collection[int], step: int = 0) -> bool:
+        """Start the subtask if it is not started and its dependencies are met. Returns whether it started."""
+        if self.status != SubTaskStatus.NOT_STARTED or not self.can_start(completed_subtasks):
+            return False
+        self._set_status(SubTaskStatus.IN_PROGRESS)
+        self.start_time = step
+        return True
+
+    def start(self, completed_subtasks: Collection[int] = None, step: int = 0):
         """Start the subtask"""
         if completed_subtasks is None:
             completed_subtasks = []
             
-        if not self.can_start(completed_subtasks):
-            raise ValueError("Cannot start: dependencies not met")
-        
-        if self.status == SubTaskStatus.NOT_STARTED:
-            self.status = SubTaskStatus.IN_PROGRESS
-            self.start_time = step
-        else:
+        if not self._try_start(completed_subtasks, step):
+            if not self.can_start(completed_subtasks):
+                raise ValueError("Cannot start: dependencies not met")
             raise ValueError(f"Cannot start subtask with status {self.status}")
 
     def complete(self):
         """Mark the subtask as completed"""
         if self.status == SubTaskStatus.IN_PROGRESS:
-            self.status = SubTaskStatus.COMPLETED
+            self._set_status(SubTaskStatus.COMPLETED)
             self.progress = 1.0
         else:
             raise ValueError(f"Cannot complete subtask with status {self.status}")
@@ -115,28 +179,65 @@ class SubTask:
     def pause(self):
         """Pause the subtask"""
         if self.status == SubTaskStatus.IN_PROGRESS:
-            self.status = SubTaskStatus.NOT_STARTED
+            self._set_status(SubTaskStatus.NOT_STARTED)
         else:
             raise ValueError(f"Cannot pause subtask with status {self.status}")
 
+class ProgressSummary(NamedTuple):
+    """Snapshot returned by TaskTracker.get_progress_summary."""
+    total_tasks: int
+    completed_tasks: int
+    current_task_id: Optional[int]
+    current_subtask_id: Optional[int]
+    all_completed: bool
+    current_task_progress: float
+
+class WorkState(IntEnum):
+    """What TaskTracker.work_on_task does on the agent's next step."""
+    IDLE = 0  # No current task: try to start one from the backlog
+    PICKING_SUBTASK = 1  # Current task but no current subtask: start the next ready one
+    WORKING = 2  # Current subtask: work on it (or learn what it needs)
+
 class TaskTracker:
-    """Handles all task and subtask management for an engineer agent."""
+    """
+    Handles all task and subtask management for an engineer agent.
+
+    Not wired into the model: EngineerAgent schedules its own work in work_on_task
+    (with the Task/SubTask types from src/types.py), and this class expects an
+    agent.knowledge_manager that EngineerAgent does not have.
+    """
     
     def __init__(self, agent: 'EngineerAgent'):
         self.agent = agent
         self.assigned_tasks: List[Task] = []
         self.current_task: Optional[Task] = None
         self.current_subtask: Optional[SubTask] = None
-        self.completed_tasks: List[str] = []
-        self.completed_subtasks: List[str] = []
+        self.completed_tasks: List[int] = []
+        self.completed_subtasks: List[int] = []
+        self._completed_subtask_set: Set[int] = set()  # Same IDs as completed_subtasks, for dependency checks
         self.all_tasks_completed: bool = False
+        self._state: WorkState = WorkState.IDLE
+        # Last get_progress_summary result; cleared whenever a task or subtask is assigned, started or completed
+        self._summary: Optional[ProgressSummary] = None
+
+        # Queues kept alongside the lists above so picking the next task/subtask doesn't rescan them
+        self._backlog: Deque[Task] = deque()  # Assigned tasks in assignment order, not yet started
+        # Subtask scheduling for current_task, built once in start_next_task (Kahn's algorithm):
+        # not-started subtasks whose dependencies are all met, in the order they became ready,
+        # plus each waiting subtask's count of unmet dependencies and who waits on each ID
+        self._ready_subtasks: Deque[SubTask] = deque()
+        self._unmet_dependencies: Dict[int, int] = {}
+        self._dependents: Dict[int, List[SubTask]] = {}
+        # Completion counters so check_task_completion compares integers instead of rescanning
+        self._remaining_subtasks: int = 0  # Incomplete subtasks of current_task
+        self._remaining_tasks: int = 0  # Incomplete assigned tasks
     
     def get_next_available_task(self) -> Optional[Task]:
         """Get the next available task from the backlog."""
-        return next(
-            (task for task in self.assigned_tasks if task.status == TaskStatus.BACKLOG), 
-            None
-        )
+        # Drop tasks that left the backlog some other way since they were queued
+        while self._backlog and self._backlog[0].status != TaskStatus.BACKLOG:
+            self._backlog.popleft()
+        return self._backlog[0] if self._backlog else None
     
     def start_next_task(self) -> bool:
         """Start the next available task. Returns True if a task was started."""
@@ -145,56 +246,70 @@ class TaskTracker:
         
         next_task = self.get_next_available_task()
         if next_task:
+            self._backlog.popleft()
             self.current_task = next_task
+            self._summary = None
             self.current_task.start(self.agent.model.steps)
-            self.agent._log_history("task_started", {"task_id": self.current_task.id})
+            self._schedule_subtasks(next_task)
+            self._remaining_subtasks = len(next_task.subtasks) - next_task.count_subtasks(SubTaskStatus.COMPLETED)
+            self.agent._log_event("task_started", self.current_task.id)
             return True
         
         return False
     
+    def _schedule_subtasks(self, task: Task):
+        """Build the ready queue and dependency counts for task's not-started subtasks."""
+        self._ready_subtasks = deque()
+        self._unmet_dependencies = {}
+        self._dependents = {}
+        for subtask in task.subtasks:
+            if subtask.status != SubTaskStatus.NOT_STARTED:
+                continue
+            unmet = [dep for dep in dict.fromkeys(subtask.dependencies) if dep not in self._completed_subtask_set]
+            if unmet:
+                self._unmet_dependencies[subtask.id] = len(unmet)
+                for dep in unmet:
+                    self._dependents.setdefault(dep, []).append(subtask)
+            else:
+                self._ready_subtasks.append(subtask)
+
+    def _release_dependents(self, subtask_id: int):
+        """Move subtasks whose last unmet dependency was subtask_id onto the ready queue."""
+        for dependent in self._dependents.pop(subtask_id, ()):
+            self._unmet_dependencies[dependent.id] -= 1
+            if self._unmet_dependencies[dependent.id] == 0:
+                del self._unmet_dependencies[dependent.id]
+                self._ready_subtasks.append(dependent)
+
     def get_next_subtask(self) -> Optional[SubTask]:
         """Get the next subtask to work on."""
         if not self.current_task:
             return None
         
-        # Try to find an in-progress subtask
-        active_subtask = next(
-            (subtask for subtask in self.current_task.subtasks 
-             if subtask.status == SubTaskStatus.IN_PROGRESS), 
-            None
-        )
-        
-        if active_subtask:
-            return active_subtask
-        
-        # If no active subtask, start the first available unstarted subtask
-        for subtask in self.current_task.subtasks:
-            if (subtask.status == SubTaskStatus.NOT_STARTED and 
-                subtask.can_start(self.completed_subtasks)):
-                try:
-                    subtask.start(self.completed_subtasks, step=self.agent.model.steps)
-                    return subtask
-                except ValueError:
-                    continue
+        # Subtasks are only started here and stay current_subtask until completed, so
+        # there is never an in-progress subtask to resume; start the first ready one
+        while self._ready_subtasks:
+            subtask = self._ready_subtasks.popleft()
+            if subtask._try_start(self._completed_subtask_set, step=self.agent.model.steps):
+                return subtask
         
         return None
     
     def work_on_current_subtask(self):
         """Progress work on the current subtask."""
-        if not self.current_subtask:
+        subtask = self.current_subtask
+        if not subtask:
             return
         
-        self.agent._log_history("work_on_subtask", {
-            "subtask_id": self.current_subtask.id,
-            "progress": self.current_subtask.progress
-        })
+        agent = self.agent
+        if agent.log_enabled:
+            agent._log_event("work_on_subtask", subtask.id, subtask.progress)
         
-        if self.agent.knowledge_manager.has_all_required_knowledge():
+        if agent.knowledge_manager.has_all_required_knowledge():
             # If all required knowledge is known, work on the subtask
-            progress_increment = self.agent.work_efficiency * 0.1
-            self.current_subtask.progress += progress_increment
+            subtask.progress += agent.progress_per_step
             
-            if self.current_subtask.progress >= 1.0:
+            if subtask.progress >= 1.0:
                 self.complete_current_subtask()
         else:
             # Learn missing knowledge
@@ -205,12 +320,14 @@ class TaskTracker:
         if not self.current_subtask:
             return
         
+        self._summary = None
         try:
             self.current_subtask.complete()
+            self._remaining_subtasks -= 1
             self.completed_subtasks.append(self.current_subtask.id)
-            self.agent._log_history("subtask_completed", {
-                "subtask_id": self.current_subtask.id
-            })
+            self._completed_subtask_set.add(self.current_subtask.id)
+            self._release_dependents(self.current_subtask.id)
+            self.agent._log_event("subtask_completed", self.current_subtask.id)
             
             # Reset seeking behavior
             self.agent.seeking_knowledge = False
@@ -231,20 +348,20 @@ class TaskTracker:
         if not self.current_task:
             return
         
-        if all(subtask.status == SubTaskStatus.COMPLETED for subtask in self.current_task.subtasks):
+        if self._remaining_subtasks == 0:
             # All subtasks completed, mark task as completed
             try:
                 self.current_task.complete()
+                self._remaining_tasks -= 1
+                self.agent.model.completed_task_count += 1
                 self.completed_tasks.append(self.current_task.id)
-                self.agent._log_history("task_completed", {"task_id": self.current_task.id})
+                self.agent._log_event("task_completed", self.current_task.id)
                 self.current_task = None
                 
                 # Check if all tasks are completed
-                if all(task.status == TaskStatus.COMPLETED for task in self.assigned_tasks):
+                if self._remaining_tasks == 0:
                     self.all_tasks_completed = True
-                    self.agent._log_history("all_tasks_completed", {
-                        "engineer_id": self.agent.unique_id
-                    })
+                    self.agent._log_event("all_tasks_completed", self.agent.unique_id)
             except ValueError as e:
                 self.agent._log_history("task_completion_failed", {
                     "task_id": self.current_task.id,
@@ -274,30 +391,63 @@ class TaskTracker:
     
     def work_on_task(self):
         """Main work method - coordinates task and subtask work."""
-        # Start a new task if needed
-        if not self.current_task:
-            if not self.start_next_task():
-                return
-        
-        if self.current_task and self.current_task.status == TaskStatus.IN_PROGRESS:
-            if not self.current_subtask:
-                self.current_subtask = self.get_next_subtask()
-            
-            if self.current_subtask:
-                self.work_on_current_subtask()
+        self._state = self._STATE_HANDLERS[self._state](self)
+
+    # Each handler does one step's work for its state and returns the next state. A handler
+    # that moves on within the step calls the next handler directly, so starting a task,
+    # picking its first subtask and working on it can all still happen in one step.
+
+    def _tick_idle(self) -> WorkState:
+        if self.current_task is None and not self.start_next_task():
+            return WorkState.IDLE
+        return self._tick_picking_subtask()
+
+    def _tick_picking_subtask(self) -> WorkState:
+        if self.current_task is None:
+            return WorkState.IDLE
+        if self.current_task.status != TaskStatus.IN_PROGRESS:
+            return WorkState.PICKING_SUBTASK
+        if self.current_subtask is None:
+            self.current_subtask = self.get_next_subtask()
+            self._summary = None
+            if self.current_subtask is None:
+                return WorkState.PICKING_SUBTASK
+        return self._tick_working()
+
+    def _tick_working(self) -> WorkState:
+        if self.current_subtask is None:
+            return self._tick_picking_subtask()
+        self.work_on_current_subtask()
+        # Completing the subtask (and possibly the task) clears these
+        if self.current_subtask is not None:
+            return WorkState.WORKING
+        return WorkState.PICKING_SUBTASK if self.current_task is not None else WorkState.IDLE
+
+    _STATE_HANDLERS = {
+        WorkState.IDLE: _tick_idle,
+        WorkState.PICKING_SUBTASK: _tick_picking_subtask,
+        WorkState.WORKING: _tick_working,
+    }
     
     def assign_task(self, task: Task):
         """Assign a new task to this agent."""
         task.assign(self.agent.unique_id)
         self.assigned_tasks.append(task)
+        self._summary = None
+        if task.status == TaskStatus.BACKLOG:
+            self._backlog.append(task)
+        if task.status != TaskStatus.COMPLETED:
+            self._remaining_tasks += 1
     
-    def get_progress_summary(self) -> dict:
-        """Get a summary of task progress."""
-        return {
-            "total_tasks": len(self.assigned_tasks),
-            "completed_tasks": len(self.completed_tasks),
-            "current_task_id": self.current_task.id if self.current_task else None,
-            "current_subtask_id": self.current_subtask.id if self.current_subtask else None,
-            "all_completed": self.all_tasks_completed,
-            "current_task_progress": self.current_task.get_progress() if self.current_task else 0.0
-        }
\ No newline at end of file
+    def get_progress_summary(self) -> ProgressSummary:
+        """Get a summary of task progress (use ._asdict() for a plain dict)."""
+        if self._summary is None:
+            self._summary = ProgressSummary(
+                total_tasks=len(self.assigned_tasks),
+                completed_tasks=len(self.completed_tasks),
+                current_task_id=self.current_task.id if self.current_task else None,
+                current_subtask_id=self.current_subtask.id if self.current_subtask else None,
+                all_completed=self.all_tasks_completed,
+                current_task_progress=self.current_task.get_progress() if self.current_task else 0.0,
+            )
+        return self._summary
\ No newline at end of file
@@ -1,26 +1,42 @@
-from typing import List, Optional, Dict, Any, TYPE_CHECKING # NEW: Import TYPE_CHECKING
+from collections import deque
+from dataclasses import replace
+from typing import List, Optional, Deque, Dict, Any, TYPE_CHECKING # NEW: Import TYPE_CHECKING
 from ..types import *
 from .base import BaseAgent
 from ..rules.psychological_safety_rule import PsychologicalSafetyRule
+import logging
 import random
-import math
+import numpy as np
 
 if TYPE_CHECKING:
     from ..model import EngineeringTeamModel
 
+logger = logging.getLogger(__name__)
+
+# Handler method for each interaction type that does extra work. The collaboration,
+# help and feedback handlers are still no-op stubs, so they are left out and those
+# types fall through with a single dict miss; add them here once they do something.
+_INTERACTION_HANDLERS: Dict[InteractionType, str] = {
+    InteractionType.KNOWLEDGE_REQUEST: "handle_knowledge_request",
+}
+
 class EngineerAgent(BaseAgent):
     """Represents an individual engineer."""
+
+    agent_kind = AgentKind.ENGINEER
     
-    def __init__(self, unique_id: int, model: 'EngineeringTeamModel'):
+    def __init__(self, model: 'EngineeringTeamModel'):
         """Initialize an EngineerAgent."""
-        super().__init__(unique_id, model)
+        super().__init__(model)
         
         # Task management
         self.assigned_tasks: List[Task] = []  # Tasks assigned to this engineer
+        self._backlog: Deque[Task] = deque()  # Assigned tasks not yet started, in assignment order
         self.current_task: Optional[Task] = None
         self.current_subtask: Optional[SubTask] = None
-        self.completed_tasks: List[str] = []
-        self.completed_subtasks: List[str] = []
+        self.completed_tasks: List[int] = []
+        self.completed_subtasks: List[int] = []
+        self._open_assigned_ids: set[int] = set()  # IDs of assigned_tasks not completed yet
         self.all_tasks_completed: bool = False
         
         # Psychological Safety
@@ -33,123 +49,204 @@ class EngineerAgent(BaseAgent):
         self.availability: float = random.uniform(0.5, 1.0)  # Availability for tasks (0.5 to 1.0)
 
         # Knowledge system
-        self.learned_knowledge: set[str] = {}  # Concepts the engineer knows
+        self.learned_knowledge: set[str] = set()  # Concepts the engineer knows
+        self._learned_list: List[str] = []  # Same concepts in learning order, for O(1) random sampling
         self.knowledge_network: Dict[int, set[str]] = {}  # { unique_id : {"K001", "K002", ...}, }
-        self.concept_learning_progress: Dict[str, float] = {} # {concept_id: progress (0-1)}
-
-        # Interaction tracking
-        self.interaction_history: List[InteractionRecord] = []
+        self._agents_by_concept: Dict[str, set[int]] = {}  # Reverse of knowledge_network, kept in sync by add_known_holder
+        self._learning_progress = np.zeros(len(model.knowledge_space))  # Progress (0-1) per concept, indexed by model.concept_ids
+        # Bumped whenever learned_knowledge or the knowledge network gains an entry, so
+        # get_missing_knowledge and find_agents_with_needed_knowledge can reuse their last
+        # answer until something they depend on changes
+        self._learned_version: int = 0
+        self._network_version: int = 0
+        self._missing_cache: Optional[tuple] = None  # ((subtask_id, learned_version), missing)
+        self._targets_cache: Optional[tuple] = None  # ((subtask_id, learned_version, network_version), targets)
+
+        # Interaction tracking (the records themselves live in the model's interaction log)
         self.help_requests_made: int = 0
         self.help_requests_received: int = 0
 
         # Work tracking
-        self.work_efficiency: float = random.uniform(0.5, 1.5)  # Multiplier for work progress
+        self.work_efficiency = random.uniform(0.5, 1.5)  # Multiplier for work progress (0.5 to 1.5)
         self.focus_time: int = 0  # Time spent on current task without interruption
     
         self.seeking_knowledge: bool = False  # Whether the engineer is actively seeking knowledge
         self.seeking_agent = False
-        self.seeking_agent_targets: List[EngineerAgent] = []
+        self.seeking_agent_targets: List[int] = []  # IDs of agents known to have knowledge we're missing
+        self._seeking_target_ids: set[int] = set()  # Same IDs as a set, for matching against neighbors
+
+        # Bound handlers, resolved once so process_interaction is a single dict lookup
+        self._interaction_handlers = {
+            interaction_type: getattr(self, name) for interaction_type, name in _INTERACTION_HANDLERS.items()
+        }
+
+    @property
+    def current_task_id(self) -> Optional[int]:
+        """ID of the task currently being worked on, or None when idle."""
+        return self.current_task.id if self.current_task else None
+
+    @property
+    def work_efficiency(self) -> float:
+        """Multiplier for work progress; setting it also updates progress_per_step."""
+        return self._work_efficiency
+
+    @work_efficiency.setter
+    def work_efficiency(self, value: float):
+        self._work_efficiency = value
+        self.progress_per_step = value * 0.1  # Subtask progress made per step of work
+
+    @property
+    def concept_learning_progress(self) -> Dict[str, float]:
+        """Progress (0-1) on each concept currently being learned, keyed by concept."""
+        knowledge_space = self.model.knowledge_space
+        return {knowledge_space[i]: float(self._learning_progress[i]) for i in np.flatnonzero(self._learning_progress)}
+
+    @property
+    def interaction_history(self):
+        """Interactions this engineer initiated or received, as rows of the model's interaction log."""
+        return self.model.get_interaction_history(self.unique_id)
 
         
     def work_on_task(self):
         """Progress on current task."""
        
         if not self.current_task:
-            self.current_task = next((task for task in self.assigned_tasks if task.status == TaskStatus.BACKLOG), None)
+            self.current_task = self._next_backlog_task()
             if not self.current_task:
-                print(f"Engineer {self.unique_id} has no tasks assigned.")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Engineer %s has no tasks assigned.", self.unique_id)
                 return
             else:
                 self.current_task.start()
-                print(f"Engineer {self.unique_id} started working on task {self.current_task.id}.")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Engineer %s started working on task %s.", self.unique_id, self.current_task.id)
         if self.current_task.status == TaskStatus.IN_PROGRESS:
             if self.current_subtask:
-                print(f"Engineer {self.unique_id} is working on subtask {self.current_subtask.id} of task {self.current_task.id}.")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Engineer %s is working on subtask %s of task %s.", self.unique_id, self.current_subtask.id, self.current_task.id)
                 self.work_on_subtask()
-                if all(subtask.status == SubTaskStatus.COMPLETED for subtask in self.current_task.subtasks):
+                if self.current_task.all_subtasks_completed():
                     # All subtasks completed, mark task as completed
                     self.current_task.complete()
+                    self.model.completed_task_count += 1
                     self.completed_tasks.append(self.current_task.id)
-                    self._log_history("task_completed", {"task_id": self.current_task.id})
+                    # Tasks handed over directly (e.g. by a manager) aren't in assigned_tasks and don't count
+                    self._open_assigned_ids.discard(self.current_task.id)
+                    self._log_event("task_completed", self.current_task.id)
                     self.current_task = None
                     self.current_subtask = None
-                    if all(task.status == TaskStatus.COMPLETED for task in self.assigned_tasks):
+                    if not self._open_assigned_ids:
                         self.all_tasks_completed = True
-                        self._log_history("all_tasks_completed", {"engineer_id": self.unique_id})
+                        self._log_event("all_tasks_completed", self.unique_id)
                 elif self.current_subtask.is_complete():
                     # Move to the next subtask if current one is completed
-                    self.current_subtask = next((subtask for subtask in self.current_task.subtasks if subtask.status == SubTaskStatus.ACTIVE), None)
+                    self.current_subtask = self.current_task.first_subtask_with_status(SubTaskStatus.ACTIVE)
             else:
                 # If no current subtask, start the first subtask
-                self.current_subtask = next((subtask for subtask in self.current_task.subtasks if subtask.status == SubTaskStatus.NOT_STARTED), None)
+                self.current_subtask = self.current_task.first_subtask_with_status(SubTaskStatus.NOT_STARTED)
             
     
+    def assign_task(self, task: Task):
+        """Add a task to this engineer's assigned tasks, queueing it if it is in the backlog."""
+        self.assigned_tasks.append(task)
+        if task.status != TaskStatus.COMPLETED:
+            self._open_assigned_ids.add(task.id)
+        if task.status == TaskStatus.BACKLOG:
+            self._backlog.append(task)
+
+    def _next_backlog_task(self) -> Optional[Task]:
+        """Pop the next assigned task still in the backlog, skipping any started elsewhere."""
+        while self._backlog:
+            task = self._backlog.popleft()
+            if task.status == TaskStatus.BACKLOG:
+                return task
+        return None
+
     def work_on_subtask(self):
         """Progress on current subtask."""
-        if not self.current_subtask:
+        subtask = self.current_subtask
+        if not subtask:
             return
         
-        self._log_history("work_on_subtask", {"subtask_id": self.current_subtask.id})
+        if self.log_enabled:
+            self._log_event("work_on_subtask", subtask.id, subtask.progress)
         
-        if all(required_knowledge in self.learned_knowledge for required_knowledge in self.current_subtask.required_knowledge):
+        # One (cached) pass over the required knowledge decides both whether we can work and what to learn
+        missing_knowledge = self.get_missing_knowledge()
+        if not missing_knowledge:
             # If all required knowledge is known, work on the subtask
-            progress_increment = self.work_efficiency * 0.1
-            self.current_subtask.progress += progress_increment
+            subtask.progress += self.progress_per_step
             
-            if self.current_subtask.progress >= 1.0:
+            if subtask.progress >= 1.0:
                 # Subtask completed
-                self.current_subtask.complete()
-                self.completed_subtasks.append(self.current_subtask.id)
-                self._log_history("subtask_completed", {"subtask_id": self.current_subtask.id})
+                subtask.complete()
+                self.completed_subtasks.append(subtask.id)
+                self._log_event("subtask_completed", subtask.id)
                 self.seeking_agent_targets = []
+                self._seeking_target_ids = set()
                 self.seeking_knowledge = False
                 self.seeking_agent = False
         else:
             # If not all required knowledge is known, try to learn
-            missing_knowledge = self.get_missing_knowledge()
-            if not missing_knowledge:
-                print(f"Engineer {self.unique_id} has no missing knowledge for subtask {self.current_subtask.id}.")
-            
             self.seeking_knowledge = True
-            for concept in missing_knowledge:
-                if self.knows_agent_with_knowledge(concept):
-                    self.seeking_agent = True
-                    self.seeking_agent_targets = self.find_agents_with_needed_knowledge()
+            # Holders are only ever added to the index, so a key present means a known holder
+            if not self._agents_by_concept.keys().isdisjoint(missing_knowledge):
+                self.seeking_agent = True
+                targets = self.find_agents_with_needed_knowledge()
+                # The list is cached between changes, so the set only needs rebuilding when it is new
+                if targets is not self.seeking_agent_targets:
+                    self.seeking_agent_targets = targets
+                    self._seeking_target_ids = set(targets)
+
+            self.learn_concepts(missing_knowledge)
+
+    def learn_concepts(self, concepts: List[str]):
+        """Make one step of learning progress on each of concepts, learning those that reach 1.0."""
+        if not concepts:
+            return
 
-                if concept not in self.concept_learning_progress:
-                    self.concept_learning_progress[concept] = 0.0
-                
-                self.concept_learning_progress[concept] += self.learning_rate * self.work_efficiency * random.uniform(0.5,1.5)
-                
-                if self.concept_learning_progress[concept] >= 1.0:
-                    # Concept learned
-                    self.learned_knowledge.add(concept)
-                    self._log_history("knowledge_learned", {"concept": concept})
-                    del self.concept_learning_progress[concept]
+        # One batch of random multipliers and one vectorized update for every concept
+        concept_ids = self.model.concept_ids
+        ids = np.fromiter((concept_ids[concept] for concept in concepts), dtype=np.intp, count=len(concepts))
+        learning_coefficient = self.learning_rate * self.work_efficiency
+        progress = self._learning_progress
+        progress[ids] += learning_coefficient * self.model.rng.uniform(0.5, 1.5, len(ids))
+
+        learned = ids[progress[ids] >= 1.0]
+        if len(learned):
+            progress[learned] = 0.0
+            knowledge_space = self.model.knowledge_space
+            for i in learned.tolist():
+                # Concept learned
+                concept = knowledge_space[i]
+                self.add_knowledge(concept)
+                self._log_event("knowledge_learned", concept)
         
 
     def step(self):
         """Engineer step behavior."""
-        if not self.all_tasks_completed:
-            self.work_on_task()
-        else:
-            self._log_history("all_tasks_completed", {"engineer_id": self.unique_id})
+        if self.all_tasks_completed:
+            # Nothing left to work on or ask about (the transition was logged once, when the
+            # last task completed); other agents can still interact with us
+            return
+
+        self.work_on_task()
 
         # Attempt to interact with a nearby agent
         neighbors = self.model.grid.get_neighbors(self.pos, moore=True, include_center=False)
         if neighbors:
-            if any(agent in neighbors for agent in self.seeking_agent_targets):
-                recipient = [agent for agent in neighbors if agent in self.seeking_agent_targets][0]
-                if isinstance(recipient, EngineerAgent):
-                    self.initiate_interaction(recipient, interaction_type="help_request")
-            elif self.seeking_knowledge:
-                recipient = self.random.choice(neighbors)
-                if isinstance(recipient, EngineerAgent):
-                    self.initiate_interaction(recipient, interaction_type="knowledge_request")
-            elif self.current_subtask:
+            # First neighbor that is one of our targets, in a single pass over the neighbors
+            target_ids = self._seeking_target_ids
+            recipient = next((agent for agent in neighbors if agent.unique_id in target_ids), None) if target_ids else None
+            if recipient is not None:
+                if recipient.agent_kind == AgentKind.ENGINEER:
+                    self.initiate_interaction(recipient, interaction_type=InteractionType.HELP_REQUEST)
+            elif self.seeking_knowledge or self.current_subtask:
+                # Otherwise ask a random neighbor for knowledge, or collaborate if we aren't missing any
                 recipient = self.random.choice(neighbors)
-                if isinstance(recipient, EngineerAgent):
-                    self.initiate_interaction(recipient, interaction_type="collaboration")
+                if recipient.agent_kind == AgentKind.ENGINEER:
+                    interaction_type = InteractionType.KNOWLEDGE_REQUEST if self.seeking_knowledge else InteractionType.COLLABORATION
+                    self.initiate_interaction(recipient, interaction_type=interaction_type)
         elif self.seeking_agent and self.seeking_agent_targets:
             # If seeking agent is enabled, try to move toward a target
             target = self.get_closest_agent(self.seeking_agent_targets) if self.current_subtask else None
@@ -168,56 +265,50 @@ class EngineerAgent(BaseAgent):
         possible_steps = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
         if possible_steps:
             new_position = self.random.choice(possible_steps)
-            self.model.grid.move_agent(self, new_position)
+            self.model.move_agent(self, new_position)
 
 
-    def process_interaction(self, recipient: 'EngineerAgent', interaction_type: Any = None, speaking_percentage: int = 0, details: Dict[str, Any] = None):
+    def process_interaction(self, recipient: 'EngineerAgent', interaction_type: Optional[InteractionType] = None, speaking_percentage: int = 0, details: InteractionDetails = None):
         """Process an interaction with another agent."""
+        assert interaction_type is None or isinstance(interaction_type, InteractionType), interaction_type
+
         # Handle specific interaction types
-        interaction_type_enum = InteractionType(interaction_type) if interaction_type else None
-
-        if interaction_type_enum == InteractionType.COLLABORATION:
-            self.handle_collaboration(recipient, details)
-        elif interaction_type_enum == InteractionType.HELP_REQUEST:
-            self.handle_help_request(recipient, details)
-        elif interaction_type_enum == InteractionType.HELP_OFFER:
-            self.handle_help_offer(recipient, details)
-        elif interaction_type_enum == InteractionType.KNOWLEDGE_REQUEST:
-            self.handle_knowledge_request(recipient, details)
-        elif interaction_type_enum == InteractionType.FEEDBACK:
-            self.handle_feedback(recipient, details)
+        handler = self._interaction_handlers.get(interaction_type)
+        if handler:
+            handler(recipient, details)
         
-        speaking_time = speaking_percentage * details["interaction_duration"]
+        speaking_time = speaking_percentage * details.interaction_duration
         
         self.pps += recipient.cps * speaking_time * 0.01
         self.update_cps()
-        
-        # Record the interaction
-        interaction_record = InteractionRecord(
-            step=self.model.steps,
-            initiator_id=str(self.unique_id),
-            recipient_id=str(recipient.unique_id),
-            interaction_type=interaction_type,
-            duration=details.get("interaction_duration", 0),
-        )
-        self.interaction_history.append(interaction_record)
 
     
-    def receive_interaction(self, sender_agent: 'EngineerAgent', interaction_type: Any = None, details: Dict[str, Any] = None, **kwargs):
+    def receive_interaction(self, sender_agent: 'EngineerAgent', interaction_type: Any = None, details: InteractionDetails = None, **kwargs):
         """Receive an interaction from another agent."""
         super().receive_interaction(sender_agent, interaction_type, details)
 
-        self.process_interaction(sender_agent, interaction_type = interaction_type, speaking_percentage = 1 - details["sender_speaking_percentage"], details = details)
+        self.process_interaction(sender_agent, interaction_type = interaction_type, speaking_percentage = 1 - details.sender_speaking_percentage, details = details)
 
 
-    def initiate_interaction(self, recipient_agent, interaction_type: Any, details: Dict[str, Any] = {}):
-        """Initiate an interaction with another agent."""
-        details["interaction_duration"] = self.random.uniform(1.0, 5.0)
-        details["sender_speaking_percentage"] = self.random.uniform(0.05, 0.95)
+    def initiate_interaction(self, recipient_agent, interaction_type: Any, details: InteractionDetails = None):
+        """Initiate an interaction with another agent. details is copied, not modified: the queued copy stays as sent."""
+        details = replace(
+            details if details is not None else InteractionDetails(),
+            interaction_duration=self.model.next_uniform(1.0, 5.0),
+            sender_speaking_percentage=self.model.next_uniform(0.05, 0.95),
+        )
 
         super().initiate_interaction(recipient_agent, interaction_type, details)
 
-        self.process_interaction(recipient_agent, interaction_type = interaction_type, speaking_percentage = details["sender_speaking_percentage"], details = details,)
+        self.process_interaction(recipient_agent, interaction_type = interaction_type, speaking_percentage = details.sender_speaking_percentage, details = details,)
+
+        # Record the interaction once, from the initiator's side
+        self.model.record_interaction(
+            self.unique_id,
+            recipient_agent.unique_id,
+            interaction_type,
+            details.interaction_duration,
+        )
 
     
     def update_cps(self):
@@ -232,119 +323,176 @@ class EngineerAgent(BaseAgent):
         self.cps = max(min(self.cps, 1.0), -1.0)
 
     
-    def handle_collaboration(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
+    def handle_collaboration(self, recipient: 'EngineerAgent', details: InteractionDetails):
         """Handle collaboration interaction - general knowledge sharing."""
         pass
 
     
-    def handle_help_request(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
+    def handle_help_request(self, recipient: 'EngineerAgent', details: InteractionDetails):
         """Handle help request interaction."""
         pass
 
     
-    def handle_help_offer(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
+    def handle_help_offer(self, recipient: 'EngineerAgent', details: InteractionDetails):
         """Handle help offer interaction - proactive knowledge sharing."""
         pass
 
 
-    def initiate_knowledge_request(self, recipient: 'EngineerAgent', details: Dict[str, Any]) -> Dict[str, Any]:
-        """Initiate a knowledge request interaction. Should return interaction details."""
-        return {
-            "interaction_type": InteractionType.KNOWLEDGE_REQUEST,
-            "recipient": recipient.name,
-            "requested_concepts": self.get_missing_knowledge(),
-            "interaction_duration": self.random.uniform(1.0, 5.0),
-            "sender_speaking_percentage": self.random.uniform(0.05, 0.95)
-        }
+    def initiate_knowledge_request(self, recipient: 'EngineerAgent', details: InteractionDetails) -> InteractionDetails:
+        """Initiate a knowledge request interaction. Returns a filled-in copy of details."""
+        return replace(
+            details,
+            requested_concepts=list(self.get_missing_knowledge()),
+            interaction_duration=self.model.next_uniform(1.0, 5.0),
+            sender_speaking_percentage=self.model.next_uniform(0.05, 0.95),
+        )
     
 
-    def receive_knowledge_request(self, sender: 'EngineerAgent', details: Dict[str, Any]):
+    def receive_knowledge_request(self, sender: 'EngineerAgent', details: InteractionDetails):
         """Receive a knowledge request from another agent."""
-        for concept in details.get("requested_concepts", []):
-            if concept in self.learned_knowledge:
-                # If we know the concept, initiate a knowledge share
-                details["concept"] = concept
-                self.initiate_interaction(sender, "knowledge_share", details=details)
-            elif self.knows_agent_with_knowledge(concept):
-                # If we know an agent has this knowledge, update the knowledge network
-                for agent in sender.get_agents_with_knowledge(concept):
-                    sender.knowledge_network.setdefault(agent.unique_id, set()).add(concept)
+        requested = set(details.requested_concepts)
+        shareable = requested & self.learned_knowledge
+        remaining = requested - self.learned_knowledge
+
+        # Share what we know, one interaction per concept (sorted so the order of shares doesn't depend on set ordering)
+        for concept in sorted(shareable):
+            self.initiate_interaction(sender, InteractionType.KNOWLEDGE_SHARE, details=self.initiate_knowledge_share(sender, concept, details))
+
+        # For the rest, point the sender at agents we know have the concept
+        holders = self.get_agents_with_knowledge_bulk(remaining)
+        for concept in remaining:
+            if concept in holders:
+                for unique_id in holders[concept]:
+                    sender.add_known_holder(unique_id, concept)
             else:
-                sender.knowledge_network.setdefault(self.unique_id, set()).add(random.choice(list(self.learned_knowledge)))
+                sender.add_known_holder(self.unique_id, self.sample_learned_knowledge())
         
         
-    def handle_knowledge_request(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
-        """Handle knowledge sharing interaction."""
-        details.update(self.initiate_knowledge_request(recipient, details))
-        recipient.receive_knowledge_request(self, details)
+    def handle_knowledge_request(self, recipient: 'EngineerAgent', details: InteractionDetails):
+        """Handle knowledge sharing interaction: the request reaches the recipient when the model delivers pending interactions."""
+        self.model.pending_interactions.append(
+            (recipient.receive_knowledge_request, (self, self.initiate_knowledge_request(recipient, details)))
+        )
 
 
-    def initiate_knowledge_share(self, recipient: 'EngineerAgent', concept: str, details: Dict[str, Any]) -> Dict[str, Any]:
-        """Initiate a knowledge share interaction."""
-        return {
-            "interaction_type": InteractionType.KNOWLEDGE_SHARE,
-            "recipient": recipient.unique_id,
-            "shared_concept": concept,
-        }      
+    def initiate_knowledge_share(self, recipient: 'EngineerAgent', concept: str, details: InteractionDetails) -> InteractionDetails:
+        """Initiate a knowledge share interaction. Returns a copy of details carrying concept."""
+        return replace(details, shared_concept=concept)
 
-    def receive_knowledge_share(self, sender: 'EngineerAgent', details: Dict[str, Any]):
+    # KNOWLEDGE_SHARE has no entry in _INTERACTION_HANDLERS, so the receiving side of a share
+    # (handle_knowledge_share -> receive_knowledge_share / receive_knowledge_share_bulk) is not
+    # reached by the simulation yet: a share only counts as an interaction.
+    def receive_knowledge_share(self, sender: 'EngineerAgent', details: InteractionDetails):
         """Receive a knowledge share from another agent."""
-        concept = details.get("shared_concept")
+        concept = details.shared_concept
         if concept:
             if concept not in self.learned_knowledge:
-                self.learned_knowledge.add(concept)
+                self.add_knowledge(concept)
                 # Update knowledge network
-                self.knowledge_network.setdefault(sender.unique_id, set()).add(concept)
+                self.add_known_holder(sender.unique_id, concept)
                 # Optionally, log the knowledge share
                 self._log_history("knowledge_share_received", {
                     "sender": sender.unique_id,
                     "shared_concept": concept
                 })
-            sender.knowledge_network.setdefault(self.unique_id, set()).add(concept)
-        
-
-    def handle_knowledge_share(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
+            sender.add_known_holder(self.unique_id, concept)
+
+    def receive_knowledge_share_bulk(self, sender: 'EngineerAgent', concepts: List[str]):
+        """Receive several shared concepts from one agent with a single network update and log entry."""
+        new_concepts = [concept for concept in dict.fromkeys(concepts) if concept not in self.learned_knowledge]
+        for concept in new_concepts:
+            self.add_knowledge(concept)
+        self.add_known_holder_bulk(sender.unique_id, concepts)
+        if new_concepts:
+            self._log_history("knowledge_share_received_bulk", {
+                "sender": sender.unique_id,
+                "shared_concepts": new_concepts
+            })
+        sender.add_known_holder_bulk(self.unique_id, concepts)
+
+
+    def handle_knowledge_share(self, recipient: 'EngineerAgent', details: InteractionDetails):
         """Handle knowledge sharing interaction."""
-        details.update(self.initiate_knowledge_request(recipient, details.get("requested_concepts", None), details))
         recipient.receive_knowledge_share(self, details)
         
     
-    def handle_feedback(self, recipient: 'EngineerAgent', details: Dict[str, Any]):
+    def handle_feedback(self, recipient: 'EngineerAgent', details: InteractionDetails):
         """Handle feedback interaction - performance and knowledge feedback."""
         pass
 
     
+    def set_learned_knowledge(self, concepts: List[str]):
+        """Replace the engineer's known concepts."""
+        self.learned_knowledge = set(concepts)
+        self._learned_list = list(dict.fromkeys(concepts))
+        self._learned_version += 1
+
+    def add_knowledge(self, concept: str):
+        """Add a concept to learned_knowledge, keeping the indexed view used for sampling in sync."""
+        if concept not in self.learned_knowledge:
+            self.learned_knowledge.add(concept)
+            self._learned_list.append(concept)
+            self._learned_version += 1
+
+    def sample_learned_knowledge(self) -> str:
+        """Pick one known concept at random without copying the set."""
+        return self._learned_list[self.random.randrange(len(self._learned_list))]
+
     def knows_agent_has_knowledge(self, unique_id: int, concept: str) -> bool:
         """Check if we know that a specific agent has a specific knowledge concept."""
         return (unique_id in self.knowledge_network and 
                 concept in self.knowledge_network[unique_id])
 
+    def add_known_holder(self, unique_id: int, concept: str):
+        """Record that agent unique_id has concept, in both the knowledge network and its reverse index."""
+        holders = self._agents_by_concept.setdefault(concept, set())
+        if unique_id not in holders:
+            holders.add(unique_id)
+            self.knowledge_network.setdefault(unique_id, set()).add(concept)
+            self._network_version += 1
+
+    def add_known_holder_bulk(self, unique_id: int, concepts: List[str]):
+        """Record that agent unique_id has every one of concepts."""
+        added = False
+        for concept in concepts:
+            holders = self._agents_by_concept.setdefault(concept, set())
+            if unique_id not in holders:
+                holders.add(unique_id)
+                self.knowledge_network.setdefault(unique_id, set()).add(concept)
+                added = True
+        # Like add_known_holder, only a genuinely new holder invalidates the cached targets
+        if added:
+            self._network_version += 1
+
     def knows_agent_with_knowledge(self, concept: str) -> bool:
         """Check if we know any agent has a specific knowledge concept."""
-        return any(concept in concepts for concepts in self.knowledge_network.values())
+        return bool(self._agents_by_concept.get(concept))
     
     def get_agents_with_knowledge(self, concept: str) -> List[int]:
         """Get list of agent IDs that we know have a specific knowledge concept."""
-        return [agent for agent, concepts in self.knowledge_network.items() 
-                if concept in concepts]
+        return list(self._agents_by_concept.get(concept, ()))
+    
+    def get_agents_with_knowledge_bulk(self, concepts: set[str]) -> Dict[str, List[int]]:
+        """Map each of the given concepts to the agent IDs we know have it."""
+        return {
+            concept: list(self._agents_by_concept[concept])
+            for concept in concepts if self._agents_by_concept.get(concept)
+        }
     
     def find_agents_with_needed_knowledge(self) -> List[int]:
         """Find agents who have knowledge needed for current subtask."""
         if not self.current_subtask:
             return []
         
-        potential_targets = []
-        needed_knowledge = self.current_subtask.required_knowledge
+        key = (self.current_subtask.id, self._learned_version, self._network_version)
+        if self._targets_cache is not None and self._targets_cache[0] == key:
+            return self._targets_cache[1]
         
-        for concept in needed_knowledge:
-            # Only look for knowledge we don't already have
-            if concept not in self.learned_knowledge:
-                # Find agents we know have this knowledge
-                agents_with_knowledge = self.get_agents_with_knowledge(concept)
-                potential_targets.extend(agents_with_knowledge)
-        
-        # Remove duplicates and return
-        return list(set(potential_targets))
+        # Agents we know have any concept we're still missing, as one union over the reverse index
+        agents_by_concept = self._agents_by_concept
+        targets = list(set().union(*(agents_by_concept.get(concept, ()) for concept in self.get_missing_knowledge())))
+        self._targets_cache = (key, targets)
+        return targets
     
     def get_missing_knowledge(self) -> List[str]:
         """Get a list of knowledge concepts needed for the current subtask."""
@@ -352,15 +500,18 @@ class EngineerAgent(BaseAgent):
         if not self.current_subtask:
             return []
         
-        missing_knowledge = []
-        needed_knowledge = self.current_subtask.required_knowledge
+        key = (self.current_subtask.id, self._learned_version)
+        if self._missing_cache is not None and self._missing_cache[0] == key:
+            return self._missing_cache[1]
 
-        for concept in needed_knowledge:
-            # Only include concepts we don't already know
-            if concept not in self.learned_knowledge:
-                missing_knowledge.append(concept)
-
-        return missing_knowledge
+        needed_knowledge = self.current_subtask.required_knowledge
+        if self.learned_knowledge.issuperset(needed_knowledge):
+            missing = []
+        else:
+            # Only include concepts we don't already know, in the subtask's order
+            missing = [concept for concept in needed_knowledge if concept not in self.learned_knowledge]
+        self._missing_cache = (key, missing)
+        return missing
     
     def get_closest_agent_with_knowledge(self, concept: str) -> Optional['EngineerAgent']:
         """Get the closest agent who has a specific knowledge concept."""
@@ -369,41 +520,18 @@ class EngineerAgent(BaseAgent):
         if not agents_with_knowledge:
             return None
         
-        nearest_agent = None
-        min_distance = float('inf')
-        
-        for unique_id in agents_with_knowledge:
-            target_agent = self.model.get_agent_by_id(unique_id)
-            if target_agent and target_agent.pos:
-                distance = self.model.grid.get_distance(self.pos, target_agent.pos)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_agent = target_agent
-        
-        return nearest_agent
+        # Euclidean distances to every holder in one pass over the model's position array
+        unique_id = self.model.get_closest_agent_id(self.pos, agents_with_knowledge, metric="euclidean")
+        return self.model.get_agent_by_id(unique_id) if unique_id is not None else None
     
     def get_closest_agent(self, targets: List['EngineerAgent']) -> Optional['EngineerAgent']:
         """Get the closest agent who has a specific knowledge concept."""
         if not targets:
             return None
         
-        nearest_agent = None
-        min_distance = float('inf')
-        
-        for unique_id in targets:
-            target_agent = self.model.get_agent_by_id(unique_id)
-            if target_agent and target_agent.pos:
-                # Calculate Manhattan or Euclidean distance
-                dx = abs(self.pos[0] - target_agent.pos[0])
-                dy = abs(self.pos[1] - target_agent.pos[1])
-                distance = dx + dy  # Manhattan distance
-                # Or use: distance = math.sqrt(dx**2 + dy**2)  # Euclidean distance
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_agent = target_agent
-        
-        return nearest_agent
+        # Manhattan distances to every target in one pass over the model's position array
+        unique_id = self.model.get_closest_agent_id(self.pos, targets)
+        return self.model.get_agent_by_id(unique_id) if unique_id is not None else None
 
     
     def move_toward_agent(self, target: Optional['EngineerAgent']) -> bool:
@@ -412,20 +540,16 @@ class EngineerAgent(BaseAgent):
             # Get possible moves
             possible_steps = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
             
-            # Find the move that gets us closest to the target
-            best_move = None
-            best_distance = float('inf')
-            
-            for step in possible_steps:
-                dx = abs(step[0] - target.pos[0])
-                dy = abs(step[1] - target.pos[1])
-                distance = math.sqrt(dx**2 + dy**2)
-                if distance < best_distance:
-                    best_distance = distance
-                    best_move = step
+            # Find the move that gets us closest to the target (squared distance ranks the same as Euclidean)
+            tx, ty = target.pos
+            best_move = min(
+                possible_steps,
+                key=lambda step: (step[0] - tx) ** 2 + (step[1] - ty) ** 2,
+                default=None,
+            )
             
             if best_move:
-                self.model.grid.move_agent(self, best_move)
+                self.model.move_agent(self, best_move)
                 return True
         
         return False
\ No newline at end of file
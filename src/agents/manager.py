@@ -1,6 +1,5 @@
 from .base import BaseAgent
-from .engineer import EngineerAgent
-from ..types import TaskStatus # Note: InteractionType is not imported here for minimal setup.
+from ..types import AgentKind, TaskStatus # Note: InteractionType is not imported here for minimal setup.
 from typing import TYPE_CHECKING # NEW: Import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -8,9 +7,11 @@ if TYPE_CHECKING:
 
 class ManagerAgent(BaseAgent):
     """Represents a team manager who assigns tasks."""
+
+    agent_kind = AgentKind.MANAGER
     
-    def __init__(self, unique_id: int, model: 'EngineeringTeamModel'):
-        super().__init__(unique_id, model)
+    def __init__(self, model: 'EngineeringTeamModel'):
+        super().__init__(model)
         # TODO: Add management_attributes
         
     def assign_tasks(self):
@@ -18,7 +19,7 @@ class ManagerAgent(BaseAgent):
         available_tasks = [t for t in self.model.tasks.values() 
                           if t.status == TaskStatus.BACKLOG]
         available_engineers = [a for a in self.model.agents 
-                             if isinstance(a, EngineerAgent) and a.current_task is None]
+                             if a.agent_kind == AgentKind.ENGINEER and a.current_task is None]
         
         # Simple assignment: first available task to first available engineer
         if available_tasks and available_engineers:
@@ -1,21 +1,27 @@
 import mesa
+import numpy as np
 import random
-from statistics import mean
-from typing import Dict
-from .types import Task, TaskStatus, SubTask, SubTaskStatus
-from .agents import EngineerAgent, ManagerAgent
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .types import Task, TaskStatus, SubTask, SubTaskStatus, InteractionType, INTERACTION_DTYPE, INTERACTION_TYPE_CODES, NO_INTERACTION_TYPE
+from .agents import BaseAgent, EngineerAgent, ManagerAgent
 from .rules import PsychologicalSafetyRule
 from .utils import log
 
+INITIAL_INTERACTION_CAPACITY = 1024
+RANDOM_BUFFER_SIZE = 10000
+
 class EngineeringTeamModel(mesa.Model):
     """Main model class for the engineering team simulation."""
     
     def __init__(self, num_steps: int = 100, num_engineers: int = 5, num_managers: int = 0, initial_tasks: int = 10,
-                 initial_psych_safety: float = 0.5, psych_safety_threshold: float = 0.7, enable_logging: bool = True):
+                 initial_psych_safety: float = 0.5, psych_safety_threshold: float = 0.7, enable_logging: bool = True,
+                 history_cap: int = 1024):
         super().__init__()
 
         self.grid = mesa.space.MultiGrid(width = 10, height = 10, torus = False)
         self.is_logging = enable_logging
+        self.history_cap = history_cap  # Actions kept in memory per agent (None for unbounded, 0 for none)
 
         self.num_engineers = num_engineers
         self.num_managers = num_managers
@@ -35,7 +41,20 @@ class EngineeringTeamModel(mesa.Model):
         self._create_knowledge_space()
         
         # Task management
-        self.tasks: Dict[str, Task] = {}
+        self.tasks: Dict[int, Task] = {}
+        self.completed_task_count = 0  # Incremented by agents as tasks complete
+
+        # Interaction log shared by all agents, one INTERACTION_DTYPE row per interaction
+        self._interactions = np.empty(INITIAL_INTERACTION_CAPACITY, dtype=INTERACTION_DTYPE)
+        self._n_interactions = 0
+
+        # Interactions initiated during a step, delivered to their recipients once all agents have stepped:
+        # each entry is the recipient's receive method and the arguments to call it with
+        self.pending_interactions: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = []
+
+        # Unit uniform draws for the agents' per-interaction randomness, generated in bulk from self.rng
+        self._random_buffer = []
+        self._random_index = 0
         
         # Create agents
         self._create_agents()
@@ -47,21 +66,21 @@ class EngineeringTeamModel(mesa.Model):
         # Basic data collection
         self.datacollector = mesa.DataCollector(
             model_reporters={
-                "Completed_Tasks": lambda m: len([t for t in m.tasks.values() 
-                                                    if t.status == TaskStatus.COMPLETED]),
+                "Completed_Tasks": "completed_task_count",
                 "Active_Tasks": lambda m: len([t for t in m.tasks.values() 
                                                 if t.status == TaskStatus.IN_PROGRESS]),
                 "Backlog_Tasks": lambda m: len([t for t in m.tasks.values()
                                                 if t.status == TaskStatus.BACKLOG]),
                 "Total_Tasks_Created": lambda m: len(m.tasks),
                 "Psychological_Safety": "psychological_safety",
-                "Average_PPS": lambda m: mean([a.pps for a in m.agents if hasattr(a, "pps")]),
-                "Average_Knowledge": lambda m: mean([len(a.learned_knowledge) for a in m.agents if hasattr(a, "learned_knowledge")]),
+                "Average_PPS": lambda m: float(np.fromiter((a.pps for a in m._engineers), dtype=float, count=len(m._engineers)).mean()),
+                "Average_Knowledge": lambda m: float(np.fromiter((len(a.learned_knowledge) for a in m._engineers), dtype=float, count=len(m._engineers)).mean()),
             },
             agent_reporters={
-                "PPS": lambda a: a.pps if hasattr(a, "pps") else None,
+                # Attribute-name reporters resolve to a plain getattr (None when missing)
+                "PPS": "pps",
                 "Knowledge": lambda a: len(a.learned_knowledge) if hasattr(a, "learned_knowledge") else None,
-                "Current_Task": lambda a: a.current_task.id if hasattr(a, "current_task") and a.current_task else None,
+                "Current_Task": "current_task_id",
             }
         )
 
@@ -127,45 +146,56 @@ class EngineeringTeamModel(mesa.Model):
 
     def _create_agents(self):
         """Create engineer and manager agents."""
-        unique_id = 0
-        
         # Create engineers
         for i in range(self.num_engineers):
             
-            agent = EngineerAgent(unique_id, self)
-            agent.learned_knowledge = set(random.sample(self.knowledge_space, k=random.randint(1, len(self.knowledge_space))))
+            agent = EngineerAgent(self)
+            agent.set_learned_knowledge(random.sample(self.knowledge_space, k=random.randint(1, len(self.knowledge_space))))
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
             self.grid.place_agent(agent, (x, y))
 
-            unique_id += 1
+        # Engineers (the only agents with pps/learned_knowledge), for the team-average reporters
+        self._engineers = [agent for agent in self.agents if isinstance(agent, EngineerAgent)]
+
+        # Index agents by id once so lookups don't scan every agent
+        self._agents_by_id = {agent.unique_id: agent for agent in self.agents}
+
+        # Grid positions of placed agents as one (N, 2) array, kept in sync by move_agent
+        placed = [agent for agent in self.agents if agent.pos is not None]
+        self._position_index = {agent.unique_id: i for i, agent in enumerate(placed)}
+        self._positions = np.array([agent.pos for agent in placed], dtype=np.int32).reshape(-1, 2)
 
     def _create_knowledge_space(self, size: int = 20):
         """Create knowledge sets for the model."""
-        self.knowledge_space = [f"K{'0'*(len(str(size)) - len(str(i)))}{i}" for i in range(1, size + 1)]
+        # Interned so every set/dict holding a concept shares one string object (cheap identity hits on lookup)
+        self.knowledge_space = [sys.intern(f"K{'0'*(len(str(size)) - len(str(i)))}{i}") for i in range(1, size + 1)]
+        # Position of each concept in knowledge_space, used to index per-concept arrays
+        self.concept_ids: Dict[str, int] = {concept: i for i, concept in enumerate(self.knowledge_space)}
         print(f"Knowledge space created with {len(self.knowledge_space)} knowledge items. Formatted as {next(iter(self.knowledge_space))}")
 
     def _create_initial_tasks(self, num_tasks: int):
         """Create initial set of tasks."""
-        for i in range(num_tasks):
-            difficulty = random.randint(1, 10)
-
+        # Task and subtask difficulties (1-10) for every task, drawn in one batch
+        difficulties = self.rng.integers(1, 11, size=(num_tasks, 2)).tolist()
+        for i, (difficulty, subtask_difficulty) in enumerate(difficulties):
             task = Task(name=f"Task {i+1}", difficulty=difficulty)
 
-            self._create_subtasks(task, num_subtasks=difficulty)
+            self._create_subtasks(task, num_subtasks=difficulty, difficulty=subtask_difficulty)
 
             self.tasks[task.id] = task
 
-    def _create_subtasks(self, task: Task, num_subtasks: int):
+    def _create_subtasks(self, task: Task, num_subtasks: int, difficulty: Optional[int] = None):
         """Create subtasks for a given task."""
         
-        difficulty = random.randint(1, 10)
+        if difficulty is None:
+            difficulty = random.randint(1, 10)
 
         required_knowledge = random.sample(self.knowledge_space, k=difficulty) if self.knowledge_space else []
         
         for i in range(num_subtasks):
             subtask = SubTask(name=f"{task.name} {i+1}", required_knowledge=required_knowledge, difficulty=difficulty)
-            task.subtasks.append(subtask)
+            task.add_subtask(subtask)
 
     def _assign_initial_tasks(self):
         """Assign initial tasks to engineers, ensuring each gets at least one."""
@@ -178,7 +208,7 @@ class EngineeringTeamModel(mesa.Model):
                 task = tasks[i]
                 task.assigned_to = engineer.unique_id
                 task.status = TaskStatus.BACKLOG
-                engineer.assigned_tasks.append(task)
+                engineer.assign_task(task)
                 print(f"Assigned {task.name} to Engineer {engineer.unique_id}")
         
         # Then randomly assign remaining tasks
@@ -186,7 +216,7 @@ class EngineeringTeamModel(mesa.Model):
             engineer = self.random.choice(engineers)
             task.assigned_to = engineer.unique_id
             task.status = TaskStatus.BACKLOG
-            engineer.assigned_tasks.append(task)
+            engineer.assign_task(task)
             print(f"Assigned {task.name} to Engineer {engineer.unique_id}")
 
     def _generate_new_task(self):
@@ -205,10 +235,13 @@ class EngineeringTeamModel(mesa.Model):
                
         # Step all agents
         self.agents.shuffle_do("step")
+        self._deliver_pending_interactions()
 
         # Collect data
         self.datacollector.collect(self)
 
+        # Write this step's agent actions out before the step_end marker
+        log.batcher.flush()
         log.log_model_event(
             self.steps,
             "step_end"
@@ -221,7 +254,71 @@ class EngineeringTeamModel(mesa.Model):
     
     def get_agent_by_id(self, unique_id: str):
         """Get an agent by its unique ID."""
-        for agent in self.agents:
-            if agent.unique_id == unique_id:
-                return agent
-        return None
+        return self._agents_by_id.get(unique_id)
+
+    def move_agent(self, agent: BaseAgent, pos: Tuple[int, int]):
+        """Move an agent on the grid and update its cached position."""
+        self.grid.move_agent(agent, pos)
+        self._positions[self._position_index[agent.unique_id]] = pos
+
+    def get_closest_agent_id(self, pos: Tuple[int, int], unique_ids: List[int], metric: str = "manhattan") -> Optional[int]:
+        """ID of the placed agent in unique_ids nearest to pos (first wins ties).
+
+        metric is "manhattan" or "euclidean" (ranked by squared distance, as grid.get_distance would order them).
+        """
+        ids = [unique_id for unique_id in unique_ids if unique_id in self._position_index]
+        if not ids:
+            return None
+        rows = [self._position_index[unique_id] for unique_id in ids]
+        offsets = self._positions[rows] - pos
+        if metric == "euclidean":
+            distances = (offsets * offsets).sum(axis=1)
+        else:
+            distances = np.abs(offsets).sum(axis=1)
+        return ids[int(distances.argmin())]
+
+    def _deliver_pending_interactions(self):
+        """Deliver queued interactions in the order they were initiated, including any queued while delivering."""
+        # Each batch is taken off the model before it is delivered, so a handler that raises
+        # can't leave already-delivered interactions queued for the next step
+        while self.pending_interactions:
+            pending, self.pending_interactions = self.pending_interactions, []
+            for receive, args in pending:
+                receive(*args)
+
+    def record_interaction(self, initiator_id: int, recipient_id: int, interaction_type: InteractionType = None, duration: float = 0.0):
+        """Append one interaction to the model-wide log, doubling its capacity when full."""
+        if self._n_interactions == len(self._interactions):
+            grown = np.empty(2 * len(self._interactions), dtype=INTERACTION_DTYPE)
+            grown[:self._n_interactions] = self._interactions
+            self._interactions = grown
+
+        self._interactions[self._n_interactions] = (
+            self.steps,
+            initiator_id,
+            recipient_id,
+            INTERACTION_TYPE_CODES.get(interaction_type, NO_INTERACTION_TYPE),
+            duration,
+        )
+        self._n_interactions += 1
+
+    @property
+    def interactions(self) -> np.ndarray:
+        """View of the recorded interactions (structured array with INTERACTION_DTYPE)."""
+        return self._interactions[:self._n_interactions]
+
+    def get_interaction_history(self, unique_id: int, last: int = None) -> np.ndarray:
+        """Interactions the given agent took part in (as initiator or recipient), optionally only the most recent `last` of them."""
+        interactions = self.interactions
+        history = interactions[(interactions['initiator'] == unique_id) | (interactions['recipient'] == unique_id)]
+        return history[-last:] if last else history
+
+    def next_uniform(self, low: float, high: float) -> float:
+        """Draw from U(low, high), consuming the pre-generated buffer and refilling it when exhausted."""
+        if self._random_index == len(self._random_buffer):
+            # Stored as Python floats: indexing a list is cheaper than boxing numpy scalars one at a time
+            self._random_buffer = self.rng.random(RANDOM_BUFFER_SIZE).tolist()
+            self._random_index = 0
+        u = self._random_buffer[self._random_index]
+        self._random_index += 1
+        return low + (high - low) * u
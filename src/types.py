@@ -1,15 +1,21 @@
 # Core data types and enums for the engineering team model
 
-from enum import Enum
-from typing import Dict, List, Optional, Any
+from enum import Enum, IntEnum, StrEnum
+from typing import Collection, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
-import uuid
+import itertools
 import random
+import sys
+import numpy as np
 
 # =============================================================================
 # ENUMS AND DATA CLASSES
 # =============================================================================
 
+# Task and subtask IDs are handed out sequentially, starting at 1
+_task_ids = itertools.count(1)
+_subtask_ids = itertools.count(1)
+
 class TaskStatus(Enum):
     BACKLOG = "backlog"
     IN_PROGRESS = "in_progress"
@@ -24,7 +30,13 @@ class SubTaskStatus(Enum):
     WORKING = "working"
     LEARNING = "learning"
 
-class InteractionType(Enum):
+class AgentKind(IntEnum):
+    # Tag for telling agent types apart on hot paths with an integer comparison instead of isinstance
+    OTHER = 0
+    ENGINEER = 1
+    MANAGER = 2
+
+class InteractionType(StrEnum):
     COLLABORATION = "collaboration"
     HELP_REQUEST = "help_request"
     HELP_OFFER = "help_offer"
@@ -32,18 +44,54 @@ class InteractionType(Enum):
     KNOWLEDGE_SHARE = "knowledge_share"
     FEEDBACK = "feedback"
 
-@dataclass
+@dataclass(slots=True)
 class Task:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: int = field(default_factory=lambda: next(_task_ids))
     name: str = ""
     status: TaskStatus = TaskStatus.BACKLOG
     assigned_to: Optional[str] = None
     difficulty: int = field(default_factory=lambda: random.randint(1, 10))
     subtasks: List['SubTask'] = field(default_factory=list)
 
+    # Status of each subtask by position in subtasks, kept in sync by add_subtask and the SubTask
+    # status methods, so status scans run over one flat list instead of every SubTask object
+    _subtask_status: List['SubTaskStatus'] = field(default_factory=list, init=False, repr=False, compare=False)
+    _completed_subtasks: int = field(default=0, init=False, repr=False, compare=False)  # Count of COMPLETED in _subtask_status
+
+    def __post_init__(self):
+        subtasks, self.subtasks = self.subtasks, []
+        for subtask in subtasks:
+            self.add_subtask(subtask)
+
+    def add_subtask(self, subtask: 'SubTask'):
+        """Append a subtask to this task, registering it in the status list."""
+        subtask._task = self
+        subtask._index = len(self.subtasks)
+        self.subtasks.append(subtask)
+        self._subtask_status.append(subtask.status)
+        if subtask.status == SubTaskStatus.COMPLETED:
+            self._completed_subtasks += 1
+
+    def all_subtasks_completed(self) -> bool:
+        """Whether every subtask is completed (O(1), from the maintained counter)."""
+        return self._completed_subtasks == len(self.subtasks)
+
+    def count_subtasks(self, status: 'SubTaskStatus') -> int:
+        """Number of subtasks with the given status."""
+        return self._subtask_status.count(status)
+
+    def first_subtask_with_status(self, status: 'SubTaskStatus') -> Optional['SubTask']:
+        """First subtask, in order, with the given status, or None."""
+        try:
+            return self.subtasks[self._subtask_status.index(status)]
+        except ValueError:
+            return None
+
     def get_progress(self) -> float:
-        completed_subtasks = len([task for task in self.subtasks if task.status == "completed"])
-        return completed_subtasks / self.difficulty
+        """Fraction of subtasks completed."""
+        if not self.subtasks:
+            return 0.0
+        return self._completed_subtasks / len(self.subtasks)
 
     def start(self):
         """Start the task by changing status to IN_PROGRESS"""
@@ -74,54 +122,90 @@ class Task:
         """Remove task assignment"""
         self.assigned_to = None
 
-@dataclass
+@dataclass(slots=True)
 class SubTask:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: int = field(default_factory=lambda: next(_subtask_ids))
     name: str = ""
     status: SubTaskStatus = SubTaskStatus.NOT_STARTED
     assigned_to: Optional[str] = None
-    dependencies: List[str] = field(default_factory=list)
-    required_knowledge: List[str] = field(default_factory=list)
+    dependencies: Tuple[int, ...] = ()
+    required_knowledge: Tuple[str, ...] = ()
     required_steps: int = 0
     difficulty: int = field(default_factory=lambda: random.randint(1, 10))
     steps_completed: int = 0
     progress: float = 0.0
+    _task: Optional[Task] = field(default=None, init=False, repr=False, compare=False)  # Set by Task.add_subtask
+    _index: int = field(default=-1, init=False, repr=False, compare=False)  # Position in _task.subtasks
+
+    def _set_status(self, status: 'SubTaskStatus'):
+        """Change status, mirroring it into the owning task's status list and completion count."""
+        previous, self.status = self.status, status
+        task = self._task
+        if task is not None:
+            task._subtask_status[self._index] = status
+            if status == SubTaskStatus.COMPLETED:
+                if previous != SubTaskStatus.COMPLETED:
+                    task._completed_subtasks += 1
+            elif previous == SubTaskStatus.COMPLETED:
+                task._completed_subtasks -= 1
+
+    def __post_init__(self):
+        # Both are fixed once the subtask exists: store them as tuples, with concepts interned
+        self.dependencies = tuple(self.dependencies)
+        self.required_knowledge = tuple(sys.intern(concept) for concept in self.required_knowledge)
 
     def is_complete(self) -> bool:
         """Check if the subtask is completed"""
         return self.status == SubTaskStatus.COMPLETED
 
-    def can_start(self, completed_subtasks: List[str]) -> bool:
-        return all(dep_id in completed_subtasks for dep_id in self.dependencies)
+    def can_start(self, completed_subtasks: Collection[int]) -> bool:
+        """Check if all dependencies are satisfied; pass a set to skip the conversion."""
+        if not self.dependencies:
+            return True
+        if not isinstance(completed_subtasks, (set, frozenset)):
+            completed_subtasks = set(completed_subtasks or ())
+        return completed_subtasks.issuperset(self.dependencies)
     
-    def start(self, completed_subtasks: List[str] = None):
+    def start(self, completed_subtasks: Collection[int] = None):
         """Start the subtask"""
         
         if not self.can_start(completed_subtasks):
             raise ValueError("Cannot start: dependencies not met")
         
         if self.status == SubTaskStatus.NOT_STARTED:
-            self.status = SubTaskStatus.IN_PROGRESS
+            self._set_status(SubTaskStatus.IN_PROGRESS)
         else:
             raise ValueError(f"Cannot start subtask with status {self.status}")
 
     def complete(self):
         """Mark the subtask as completed"""
-        self.status = SubTaskStatus.COMPLETED
+        self._set_status(SubTaskStatus.COMPLETED)
 
     def pause(self):
         """Pause the subtask"""
         if self.status == SubTaskStatus.IN_PROGRESS:
-            self.status = SubTaskStatus.NOT_STARTED
+            self._set_status(SubTaskStatus.NOT_STARTED)
         else:
             raise ValueError(f"Cannot pause subtask with status {self.status}")
     
-@dataclass
-class InteractionRecord:
-    """Records details of an interaction between agents."""
-    step: int
-    initiator_id: str
-    recipient_id: str
-    interaction_type: InteractionType
-    duration: float
-    knowledge_shared: List[str] = field(default_factory=list)
\ No newline at end of file
+@dataclass(slots=True)
+class InteractionDetails:
+    """Details passed between agents for one interaction."""
+    interaction_duration: float = 0.0
+    sender_speaking_percentage: float = 0.5
+    requested_concepts: List[str] = field(default_factory=list)
+    shared_concept: Optional[str] = None
+
+# Row layout of the model-wide interaction log (see EngineeringTeamModel.record_interaction)
+INTERACTION_DTYPE = np.dtype([
+    ('step', 'i4'),
+    ('initiator', 'i4'),
+    ('recipient', 'i4'),
+    ('type', 'u1'),
+    ('duration', 'f4'),
+])
+
+# InteractionType <-> uint8 code used in the 'type' column; untyped interactions get NO_INTERACTION_TYPE
+INTERACTION_TYPE_CODES: Dict[InteractionType, int] = {t: code for code, t in enumerate(InteractionType)}
+INTERACTION_TYPES_BY_CODE: List[InteractionType] = list(InteractionType)
+NO_INTERACTION_TYPE = 255
\ No newline at end of file
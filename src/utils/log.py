@@ -1,13 +1,16 @@
+import atexit
 import logging
 import os
 import uuid
+from dataclasses import asdict, is_dataclass
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Module-level variables
 _logger: Optional[logging.Logger] = None
 _log_file: Optional[str] = None
 _configured = False
+_enabled = True  # Cleared by disable_logging; checked before any setup so disabled runs never touch a log file
 
 def _generate_log_filename() -> str:
     """Generate a timestamped log filename with random ID."""
@@ -55,6 +58,9 @@ def create_new_log_file(log_file: str = None) -> str:
     if log_file is None:
         log_file = _generate_log_filename()
     
+    # Pending agent actions belong to the file that is being closed
+    batcher.flush()
+    
     # Remove existing handlers from our logger
     if _logger:
         for handler in _logger.handlers[:]:
@@ -114,9 +120,9 @@ def _format_details(details: Dict[str, Any]) -> str:
             formatted_parts.append(f"From: Agent {value}")
         elif key == "type":
             formatted_parts.append(f"Type: {value}")
-        elif key == "details" and isinstance(value, dict):
-            # Handle nested details
-            nested = _format_details(value)
+        elif key == "details" and (isinstance(value, dict) or is_dataclass(value)):
+            # Handle nested details (plain dicts or InteractionDetails)
+            nested = _format_details(value if isinstance(value, dict) else asdict(value))
             if nested:
                 formatted_parts.append(f"Details: ({nested})")
         else:
@@ -124,25 +130,76 @@ def _format_details(details: Dict[str, Any]) -> str:
     
     return " | ".join(formatted_parts)
 
+# Field names for agent actions recorded as positional tuples (BaseAgent._log_event)
+EVENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "task_started": ("task_id",),
+    "work_on_subtask": ("subtask_id", "progress"),
+    "subtask_completed": ("subtask_id",),
+    "task_completed": ("task_id",),
+    "knowledge_learned": ("concept",),
+    "all_tasks_completed": ("engineer_id",),
+}
+
+def event_details(action: str, details: Any) -> Optional[Dict[str, Any]]:
+    """Return an action's details as a dict, expanding positional tuples using EVENT_FIELDS."""
+    if isinstance(details, tuple):
+        return dict(zip(EVENT_FIELDS[action], details))
+    return details
+
+def _format_agent_action(unique_id: int, step: int, action: str, details: Dict[str, Any] = None) -> str:
+    """Format one agent action as a log line."""
+    base_msg = f"[Step {step:03d}] Agent {unique_id:03d} - {action.upper()}"
+    
+    details = event_details(action, details)
+    if details:
+        return f"{base_msg} | {_format_details(details)}"
+    return base_msg
+
 def log_agent_action(unique_id: int, step: int, action: str, details: Dict[str, Any] = None):
     """Log an agent action with structured format."""
+    if not _enabled:
+        return
     if not _configured:
         setup_logging()
     
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]  # Include milliseconds
-    
-    base_msg = f"[Step {step:03d}] Agent {unique_id:03d} - {action.upper()}"
-    
-    if details:
-        details_str = _format_details(details)
-        full_msg = f"{base_msg} | {details_str}"
-    else:
-        full_msg = base_msg
-        
-    _logger.info(full_msg)
+    _logger.info(_format_agent_action(unique_id, step, action, details))
+
+class LogBatcher:
+    """
+    Buffers agent actions and writes them to the log in batches.
+    Entries are formatted as they are appended, so each line shows the details
+    as they were at the time of the action; flush emits one log record per
+    entry, so every line gets the usual timestamp and level prefix.
+    """
+
+    def __init__(self, threshold: int = 512):
+        self.threshold = threshold
+        self._buffer: List[str] = []
+
+    def append(self, entry: Tuple[int, int, str, Optional[Dict[str, Any]]]):
+        """Queue one agent action, flushing once the buffer reaches the threshold."""
+        if not _enabled:
+            return
+        self._buffer.append(_format_agent_action(*entry))
+        if len(self._buffer) >= self.threshold:
+            self.flush()
+
+    def flush(self):
+        """Write all queued agent actions to the log."""
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        logger = get_logger()
+        for entry in entries:
+            logger.info(entry)
+
+batcher = LogBatcher()
+atexit.register(batcher.flush)
 
 def log_model_event(step: int, event: str, details: Dict[str, Any] = None):
     """Log model-level events."""
+    if not _enabled:
+        return
     if not _configured:
         setup_logging()
     
@@ -158,9 +215,13 @@ def log_model_event(step: int, event: str, details: Dict[str, Any] = None):
 
 def log_session_end():
     """Log the end of a simulation session."""
+    if not _enabled:
+        return
     if not _configured:
         setup_logging()
     
+    batcher.flush()
+    
     _logger.info("=" * 60)
     _logger.info("SIMULATION SESSION ENDED")
     _logger.info("=" * 60)
@@ -178,10 +239,16 @@ def set_log_level(level: int):
 
 def enable_logging():
     """Enable logging."""
+    global _enabled
+    _enabled = True
     if _logger:
         _logger.disabled = False
 
 def disable_logging():
     """Disable logging."""
+    global _enabled
+    # Anything already queued belongs to the enabled period
+    batcher.flush()
+    _enabled = False
     if _logger:
         _logger.disabled = True
\ No newline at end of file